@@ -1,9 +1,19 @@
 import sys
 import json
-from src.python.calculator.gpt_expense_calculator import GroupExpenseCalculator
+from src.python.calculator.gpt_expense_calculator import get_calculator
 
+try:
+    import orjson
+    _loads = orjson.loads
+    _dumps = orjson.dumps
+except ImportError:
+    _loads = json.loads  # type: ignore[assignment]
 
-calculator = GroupExpenseCalculator()
+    def _dumps(obj):  # type: ignore[misc]
+        return json.dumps(obj).encode()
+
+
+calculator = get_calculator()
 
 def add_transactions(data):
     calculator.add_transactions(data["transactions"])
@@ -18,22 +28,22 @@ if __name__ == "__main__":
 
     if command == "add-transactions":
         try:
-            data = json.loads(sys.argv[2])
+            data = _loads(sys.argv[2])
             response = add_transactions(data)
-            print(json.dumps(response))
+            print(_dumps(response).decode())
         except Exception as e:
-            print(json.dumps({"error": str(e)}), file=sys.stderr)
+            print(_dumps({"error": str(e)}).decode(), file=sys.stderr)
             sys.exit(1)
 
     elif command == "calculate":
         try:
             response = calculate()
-            print(json.dumps(response))
+            print(_dumps(response).decode())
         except Exception as e:
-            print(json.dumps({"error": str(e)}), file=sys.stderr)
+            print(_dumps({"error": str(e)}).decode(), file=sys.stderr)
             sys.exit(1)
 
     else:
-        print(json.dumps({"error": "Invalid command"}), file=sys.stderr)
+        print(_dumps({"error": "Invalid command"}).decode(), file=sys.stderr)
         sys.exit(1)
 
@@ -1,87 +1,438 @@
-from collections import defaultdict
-from decimal import Decimal, ROUND_HALF_UP, getcontext
-from typing import List, Dict, Union, TypedDict
+from array import array
+from decimal import Context, Decimal, InvalidOperation, ROUND_HALF_UP
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Final, List, Dict, Tuple, Union, TypedDict
+import numpy as np
 import openai
+import asyncio
+import functools
+import hashlib
+import itertools
 import json
+import re
+import threading
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None  # type: ignore[assignment]
+
+try:
+    import orjson
+    _loads = orjson.loads
+
+    def _dumps_sorted(obj):
+        return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS)
+
+    def _dumps_indented(obj):
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+except ImportError:
+    _loads = json.loads  # type: ignore[assignment]
+
+    def _dumps_sorted(obj):
+        return json.dumps(obj, sort_keys=True).encode()
+
+    def _dumps_indented(obj):
+        return json.dumps(obj, indent=2).encode()
 
 
 # Define transaction structure
 class Transaction(TypedDict):
     payer: str
-    amount: str  # String format to ensure compatibility with JSON and Decimal
+    amount: Union[str, int, float]  # Numeric string as sent by the model, or a JSON number
     receivers: List[str]
 
 
-# Expense Calculator Logic with Singleton Pattern
+# Amounts are handled internally as integer cents; 999,999,999,999.99 keeps
+# every balance well inside int64
+_MAX_CENTS: Final = 99_999_999_999_999
+
+# Balances are striped across shards by name id (id % _NUM_SHARDS) so
+# concurrent batches touching different names do not contend
+_NUM_SHARDS: Final = 16
+
+# Private Decimal context for amount parsing, so the calculator neither
+# depends on nor mutates the thread's global context
+_CENTS_CONTEXT: Final = Context(prec=28, rounding=ROUND_HALF_UP)
+_CENT: Final = Decimal('0.01')
+
+
+# Accepted amount strings: up to 12 integer digits and at most 2 decimals
+_AMOUNT_RE: Final = re.compile(r"-?[0-9]{1,12}(?:\.[0-9]{1,2})?")
+
+
+def _parse_cents(amount: Union[str, int, float]) -> int:
+    if type(amount) is str:
+        return _parse_cents_str(amount)
+    if type(amount) is int:
+        return amount * 100
+    if type(amount) is float:
+        return _parse_cents_float(amount)
+    raise ValueError("Amount must be a number or a numeric string")
+
+
+# Amounts repeat a lot ("10.00", 25.5, ...), so each distinct one is parsed once
+@functools.lru_cache(maxsize=4096)
+def _parse_cents_str(amount: str) -> int:
+    if not _AMOUNT_RE.fullmatch(amount):
+        raise ValueError("Amount must be a number with at most 12 digits and 2 decimals")
+    whole, _, frac = amount.partition(".")
+    cents = abs(int(whole)) * 100 + int((frac + "00")[:2])
+    return -cents if whole.startswith("-") else cents
+
+
+@functools.lru_cache(maxsize=4096)
+def _parse_cents_float(amount: float) -> int:
+    # Go through the shortest repr so 0.1 parses as 10 cents, not 10.000...0555
+    try:
+        value = Decimal(repr(amount)).quantize(_CENT, context=_CENTS_CONTEXT)
+    except InvalidOperation:
+        value = None
+    if value is None or not value.is_finite():
+        raise ValueError("Amount must be a finite number")
+    return int(value.scaleb(2, context=_CENTS_CONTEXT))
+
+
+def _format_cents(cents: int) -> str:
+    sign = "-" if cents < 0 else ""
+    whole, frac = divmod(abs(cents), 100)
+    return f"{sign}{whole}.{frac:02d}"
+
+
+def _accumulate_loop(payer_idx: np.ndarray, amount_cents: np.ndarray, receiver_idx: np.ndarray,
+                     recv_offsets: np.ndarray, n_names: int) -> np.ndarray:
+    net = np.zeros(n_names, dtype=np.int64)
+    for t in range(len(amount_cents)):
+        amount = amount_cents[t]
+        start = recv_offsets[t]
+        count = recv_offsets[t + 1] - start
+        share = amount // count
+        rem = amount - share * count
+        net[payer_idx[t]] += amount
+        # The first `rem` receivers absorb one extra cent so the split is exact
+        for r in range(count):
+            net[receiver_idx[start + r]] -= share + (1 if r < rem else 0)
+    return net
+
+
+def _accumulate_numpy(payer_idx: np.ndarray, amount_cents: np.ndarray, receiver_idx: np.ndarray,
+                      recv_offsets: np.ndarray, n_names: int) -> np.ndarray:
+    counts = np.diff(recv_offsets)
+    share, rem = np.divmod(amount_cents, counts)
+
+    # Each receiver owes the even share; the first `rem` receivers of a
+    # transaction absorb one extra cent so every split sums exactly
+    slot = np.arange(len(receiver_idx)) - np.repeat(recv_offsets[:-1], counts)
+    owed = np.repeat(share, counts) + (slot < np.repeat(rem, counts))
+
+    # bincount sums in float64, which is exact while every partial sum stays
+    # below 2**53; larger batches use the (slower) exact int64 scatter-add
+    if np.abs(amount_cents).sum(dtype=np.float64) + len(receiver_idx) < 2.0 ** 52:
+        net = np.bincount(payer_idx, weights=amount_cents, minlength=n_names)
+        net -= np.bincount(receiver_idx, weights=owed, minlength=n_names)
+        return net.astype(np.int64)
+
+    net = np.zeros(n_names, dtype=np.int64)
+    np.add.at(net, payer_idx, amount_cents)
+    np.add.at(net, receiver_idx, -owed)
+    return net
+
+
+# The scalar loop runs at native speed once compiled; without numba the
+# vectorized NumPy version is the faster of the two. The on-disk cache is
+# off on purpose: numba records the importing module's name in it, and this
+# file is imported as calculator.*, src.python.calculator.* and run as
+# __main__, so a cache written under one name fails to load under another
+_accumulate = njit(_accumulate_loop) if njit is not None else _accumulate_numpy
+
+
+def warm_up() -> None:
+    # Compiles the kernel for the real argument types, keeping the JIT cost
+    # off the first request. Long-running processes call this at startup;
+    # short-lived ones (e.g. the CLI) skip it and only compile if they
+    # actually add transactions
+    if njit is not None:
+        _accumulate(np.zeros(1, dtype=np.int32), np.ones(1, dtype=np.int64), np.zeros(1, dtype=np.int32),
+                    np.array([0, 1], dtype=np.int32), 1)
+
+
+# Number of chat replies kept for exact repeats of a conversation state
+_REPLY_CACHE_SIZE: Final = 1024
+
+# Number of past user turns (with their tool calls and replies) sent along
+# with each new query; the system prompt is always kept
+_MAX_TURNS: Final = 8
+
+
+# Expense Calculator Logic
 class GroupExpenseCalculator:
-    _instance = None
-    _initialized = False
-    
-    def __new__(cls):
-        if cls._instance is None:
-            cls._instance = super(GroupExpenseCalculator, cls).__new__(cls)
-        return cls._instance
-    
     def __init__(self):
-        if not self._initialized:
-            getcontext().prec = 28
-            self._transactions: List[Transaction] = []
-            self._initialized = True
+        # Names are interned to small int ids and the running balance of every
+        # name is kept in cents, indexed by id. The ledger is stored as
+        # columns: transaction t was paid by _ledger_payers[t], is worth
+        # _ledger_cents[t], and split between the receivers in
+        # _ledger_receivers[_ledger_offsets[t]:_ledger_offsets[t + 1]]
+        self._ledger_payers = array('i')
+        self._ledger_cents = array('q')
+        self._ledger_receivers = array('i')
+        self._ledger_offsets = array('q', [0])
+        self._ledger_lock = threading.Lock()
+        self._names: List[str] = []
+        self._name_to_id: Dict[str, int] = {}
+        self._intern_lock = threading.Lock()
+        # Shard s holds the balance of name id i at position i // _NUM_SHARDS
+        self._shards = [np.zeros(0, dtype=np.int64) for _ in range(_NUM_SHARDS)]
+        self._shard_locks = [threading.Lock() for _ in range(_NUM_SHARDS)]
+        self._revision: int = 0
+        self._cache_key: Union[Tuple[int, int], None] = None
+        self._cached_balances: Dict[str, float] = {}
 
     def add_transactions(self, transactions: List[Transaction]) -> Dict[str, Union[str, Dict]]:
         try:
+            # The whole batch is validated before anything is recorded, so a
+            # bad row leaves the calculator untouched
+            amounts = self._validate_batch(transactions)
+            if not len(amounts):
+                return {"status": "success", "message": "Transactions added successfully."}
+
+            payer_idx: List[int] = []
+            receiver_idx: List[int] = []
+            counts: List[int] = []
+            # Bind the per-transaction callable once, outside the loop
+            intern = self._intern
             for txn in transactions:
-                self._validate_transaction(txn)
-                self._transactions.append(txn)
+                payer_idx.append(intern(txn['payer']))
+                receiver_ids = [intern(receiver) for receiver in txn['receivers']]
+                receiver_idx.extend(receiver_ids)
+                counts.append(len(receiver_ids))
+
+            recv_offsets = np.zeros(len(counts) + 1, dtype=np.int32)
+            np.cumsum(counts, out=recv_offsets[1:])
+            self._record(payer_idx, amounts, receiver_idx, recv_offsets)
+            self._apply(_accumulate(
+                np.array(payer_idx, dtype=np.int32),
+                amounts,
+                np.array(receiver_idx, dtype=np.int32),
+                recv_offsets,
+                len(self._names),
+            ))
             return {"status": "success", "message": "Transactions added successfully."}
         except Exception as e:
             return {"status": "error", "message": str(e)}
 
     def calculate_balances(self) -> Dict[str, float]:
-        net = defaultdict(Decimal)
-        for txn in self._transactions:
-            payer = txn['payer']
-            amount = Decimal(txn['amount'])
-            receivers = txn['receivers']
+        # Holding every shard lock means no batch is half-applied
+        for lock in self._shard_locks:
+            lock.acquire()
+        try:
+            cache_key = (self._revision, len(self._names))
+            if cache_key == self._cache_key:
+                return dict(self._cached_balances)
+
+            # Sum the shards while gathering them, so the zero-sum check does
+            # not need another pass over the merged balances
+            net = np.zeros(cache_key[1], dtype=np.int64)
+            total_cents: int = 0
+            for s, shard in enumerate(self._shards):
+                net[s::_NUM_SHARDS][:len(shard)] = shard
+                total_cents += int(shard.sum())
+
+            # Splits are exact in cents, so any residual means the ledger is off;
+            # settle it on the largest creditor or debtor rather than leak it.
+            # The extreme entry is only searched for when there is a residual
+            if total_cents != 0:
+                net[net.argmax() if total_cents > 0 else net.argmin()] -= total_cents
+
+            self._cached_balances = dict(zip(self._names, (net / 100).tolist()))
+            self._cache_key = cache_key
+            return dict(self._cached_balances)
+        finally:
+            for lock in self._shard_locks:
+                lock.release()
+
+    def _apply(self, delta: np.ndarray):
+        touched = [s for s in range(_NUM_SHARDS) if delta[s::_NUM_SHARDS].any()]
+        # Locks are always taken in shard order, so batches never deadlock
+        for s in touched:
+            self._shard_locks[s].acquire()
+        try:
+            for s in touched:
+                part = delta[s::_NUM_SHARDS]
+                shard = self._shards[s]
+                if len(shard) < len(part):
+                    shard = np.concatenate((shard, np.zeros(len(part) - len(shard), dtype=np.int64)))
+                shard[:len(part)] += part
+                self._shards[s] = shard
+            self._revision += 1
+        finally:
+            for s in touched:
+                self._shard_locks[s].release()
 
-            share = amount / Decimal(len(receivers))
-            net[payer] += amount
-            for receiver in receivers:
-                net[receiver] -= share
+    def _intern(self, name: str) -> int:
+        name_id = self._name_to_id.get(name)
+        if name_id is None:
+            with self._intern_lock:
+                name_id = self._name_to_id.get(name)
+                if name_id is None:
+                    # Publish the id only once the name is in place, so every
+                    # id a reader can see is below len(self._names)
+                    name_id = len(self._names)
+                    self._names.append(name)
+                    self._name_to_id[name] = name_id
+        return name_id
 
-        return {person: float(net[person].quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)) for person in net}
+    def _validate_batch(self, transactions: List[Transaction]) -> np.ndarray:
+        validate = self._validate_transaction
+        amount_cents: List[int] = []
+        for i, txn in enumerate(transactions):
+            try:
+                amount_cents.append(validate(txn))
+            except ValueError as e:
+                raise ValueError(f"Transaction {i}: {e}")
 
-    def _validate_transaction(self, transaction: Transaction):
-        if not isinstance(transaction["payer"], str):
+        # Range checks run once over the whole column; rows are only
+        # inspected individually to report the first offender
+        try:
+            amounts = np.array(amount_cents, dtype=np.int64)
+            valid = (amounts != 0) & (amounts <= _MAX_CENTS) & (amounts >= -_MAX_CENTS)
+            bad = None if valid.all() else int(np.argmax(~valid))
+        except OverflowError:
+            bad = next(i for i, cents in enumerate(amount_cents) if not -_MAX_CENTS <= cents <= _MAX_CENTS)
+        if bad is not None:
+            if not amount_cents[bad]:
+                raise ValueError(f"Transaction {bad}: Amount must be a non-zero number of cents")
+            raise ValueError(f"Transaction {bad}: Amount must not exceed 999,999,999,999.99")
+        return amounts
+
+    def _validate_transaction(self, transaction: Transaction) -> int:
+        if type(transaction["payer"]) is not str:
             raise ValueError("Payer must be a string")
-        if not isinstance(transaction["amount"], str) or not Decimal(transaction["amount"]):
-            raise ValueError("Amount must be a valid string representation of a number")
-        if not isinstance(transaction["receivers"], list) or not transaction["receivers"]:
+        cents = _parse_cents(transaction["amount"])
+        receivers = transaction["receivers"]
+        if type(receivers) is not list or not receivers:
             raise ValueError("Receivers must be a non-empty list of strings")
-        if not all(isinstance(receiver, str) for receiver in transaction["receivers"]):
+        if any(type(receiver) is not str for receiver in receivers):
             raise ValueError("All receivers must be strings")
+        return cents
+
+    def _record(self, payer_idx: List[int], amounts: np.ndarray, receiver_idx: List[int],
+                recv_offsets: np.ndarray) -> None:
+        # The columns must grow together, or the offsets would point at
+        # another batch's receivers. Cents go last so transaction_count never
+        # counts a half-recorded batch
+        with self._ledger_lock:
+            base = self._ledger_offsets[-1]
+            self._ledger_payers.extend(payer_idx)
+            self._ledger_receivers.extend(receiver_idx)
+            self._ledger_offsets.extend((recv_offsets[1:] + base).tolist())
+            self._ledger_cents.extend(amounts.tolist())
+
+    def transaction_count(self) -> int:
+        return len(self._ledger_cents)
 
     def get_transactions(self) -> List[Transaction]:
-        return self._transactions
+        # Transactions are only rebuilt as dicts when someone asks for them
+        names = self._names
+        with self._ledger_lock:
+            receivers, offsets = self._ledger_receivers, self._ledger_offsets
+            return [
+                {
+                    "payer": names[payer_id],
+                    "amount": _format_cents(cents),
+                    "receivers": [names[r] for r in receivers[offsets[t]:offsets[t + 1]]],
+                }
+                for t, (payer_id, cents) in enumerate(zip(self._ledger_payers, self._ledger_cents))
+            ]
+
+
+# Tool schema offered to the model on every completion; built once
+_TOOLS: Final = [
+    {
+        "type": "function",
+        "function": {
+            "name": "add_transactions",
+            "description": "Add one or more transactions to the calculator.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "transactions": {
+                        "type": "array",
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "payer": {"type": "string"},
+                                "amount": {"type": "string"},
+                                "receivers": {"type": "array", "items": {"type": "string"}}
+                            },
+                            "required": ["payer", "amount", "receivers"]
+                        }
+                    }
+                },
+                "required": ["transactions"]
+            }
+        }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "calculate_balances",
+            "description": "Calculate the current balances for all participants.",
+            "parameters": {
+                "type": "object",
+                "properties": {},
+                "additionalProperties": False
+            }
+        }
+    }
+]
+
+
+# Structured output for interact_batch: one answer string per query
+_BATCH_RESPONSE_FORMAT: Final = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "batch_answers",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "properties": {"answers": {"type": "array", "items": {"type": "string"}}},
+            "required": ["answers"],
+            "additionalProperties": False,
+        },
+    },
+}
+
+# A reply wrapped in a Markdown code fence, with or without a language tag
+_CODE_FENCE_RE: Final = re.compile(r"```[a-zA-Z]*\s*(.*?)\s*```", re.DOTALL)
+
+
+def _parse_batch_answers(reply: str, count: int) -> Union[list, None]:
+    # Accepts {"answers": [...]} as requested, or a bare array, optionally
+    # fenced; returns None unless there is exactly one answer per query
+    fenced = _CODE_FENCE_RE.fullmatch(reply.strip())
+    try:
+        parsed = _loads(fenced.group(1) if fenced else reply)
+    except ValueError:
+        return None
+    answers = parsed.get("answers") if isinstance(parsed, dict) else parsed
+    if not isinstance(answers, list) or len(answers) != count:
+        return None
+    return answers
+
+
+# Every conversation starts from a copy of the same system message
+_SYSTEM_MESSAGE: Final = {
+    "role": "system",
+    "content": "You are a helpful assistant managing group expenses. Use tools to process user queries.",
+}
 
 
 class GPTExpenseChat:
-    _instance = None
-    _initialized = False
-    
-    def __new__(cls, openai_client=None, calculator=None):
-        if cls._instance is None:
-            cls._instance = super(GPTExpenseChat, cls).__new__(cls)
-        return cls._instance
-    
     def __init__(self, openai_client, calculator: GroupExpenseCalculator):
-        if not self._initialized:
-            self.openai_client = openai_client
-            self.calculator = calculator
-            self.messages = [
-                {"role": "system", "content": "You are a helpful assistant managing group expenses. Use tools to process user queries."}
-            ]
-            self._initialized = True
+        self.openai_client = openai_client
+        self.calculator = calculator
+        self.messages = [dict(_SYSTEM_MESSAGE)]
+        self._reply_cache: "OrderedDict[str, str]" = OrderedDict()
 
     def add_user_message(self, content: str):
         self.messages.append({"role": "user", "content": content})
@@ -96,97 +447,108 @@ class GPTExpenseChat:
             return {"status": "success", "balances": self.calculator.calculate_balances()}
         else:
             return {"status": "error", "message": f"Unknown function: {function_name}"}
-        
-    def interact(self, user_input: str) -> Dict[str, Union[str, dict]]:
-        tools = [
-            {
-                "type": "function",
-                "function": {
-                    "name": "add_transactions",
-                    "description": "Add one or more transactions to the calculator.",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "transactions": {
-                                "type": "array",
-                                "items": {
-                                    "type": "object",
-                                    "properties": {
-                                        "payer": {"type": "string"},
-                                        "amount": {"type": "string"},
-                                        "receivers": {"type": "array", "items": {"type": "string"}}
-                                    },
-                                    "required": ["payer", "amount", "receivers"]
-                                }
-                            }
-                        },
-                        "required": ["transactions"]
-                    }
-                }
-            },
-            {
-                "type": "function",
-                "function": {
-                    "name": "calculate_balances",
-                    "description": "Calculate the current balances for all participants.",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {},
-                        "additionalProperties": False
-                    }
-                }
-            }
-        ]
+
+    def _trim_history(self):
+        # Cut only at user messages so a tool reply never loses the
+        # assistant message that requested it
+        turn_starts = [i for i, message in enumerate(self.messages) if message["role"] == "user"]
+        if len(turn_starts) > _MAX_TURNS:
+            self.messages[1:] = self.messages[turn_starts[-_MAX_TURNS]:]
+
+    def _reply_cache_key(self, user_input: str) -> str:
+        # The same conversation, input and ledger always lead to the same
+        # reply. The history is trimmed to _MAX_TURNS turns first, so hashing
+        # it stays cheap
+        state = _dumps_sorted(self.messages)
+        state += b"\0" + user_input.encode() + b"\0" + str(self.calculator.transaction_count()).encode()
+        return hashlib.blake2b(state, digest_size=16).hexdigest()
+
+    def _remember_reply(self, key: str, reply: str):
+        self._reply_cache[key] = reply
+        if len(self._reply_cache) > _REPLY_CACHE_SIZE:
+            self._reply_cache.popitem(last=False)
+
+    def _begin_turn(self, user_input: str):
+        self._trim_history()
+        cache_key = self._reply_cache_key(user_input)
+        cached_reply = self._reply_cache.get(cache_key)
 
         # Add the user input
         self.messages.append({"role": "user", "content": user_input})
 
+        if cached_reply is not None:
+            self._reply_cache.move_to_end(cache_key)
+            self.messages.append({"role": "assistant", "content": cached_reply})
+        return cache_key, cached_reply
+
+    def _finish_turn(self, cache_key: str, reply: str, tool_calls: List[dict]):
+        # Turns that added transactions must run again if repeated
+        if not any(tc["function"]["name"] == "add_transactions" for tc in tool_calls):
+            self._remember_reply(cache_key, reply)
+
+    def _record_error(self, e: Exception) -> dict:
+        error_message = {"status": "error", "message": str(e)}
+        self.messages.append({
+            "role": "assistant",
+            "content": str(error_message)
+        })
+        return error_message
+
+    async def _run_tool_calls(self, tool_calls: List[dict]):
+        tool_results = []
+        # Consecutive calls of the same kind run concurrently; switching
+        # between adding and reading waits for the previous group, so a
+        # balance request still sees the transactions added before it
+        for _, group in itertools.groupby(tool_calls, key=lambda tc: tc["function"]["name"] == "add_transactions"):
+            tool_results.extend(await asyncio.gather(*(
+                asyncio.to_thread(self.handle_function_call, tc["function"]["name"], _loads(tc["function"]["arguments"]))
+                for tc in group
+            )))
+
+        for tool_call, tool_result in zip(tool_calls, tool_results):
+            # Add the function result to messages
+            self.messages.append({
+                "role": "tool",
+                "content": str(tool_result),
+                "tool_call_id": tool_call["id"]
+            })
+
+    def interact(self, user_input: str) -> Dict[str, Union[str, dict]]:
+        # Blocking entry point for callers without an event loop (e.g. the CLI)
+        return asyncio.run(self.interact_async(user_input))
+
+    async def interact_async(self, user_input: str, response_format=openai.NOT_GIVEN) -> Dict[str, Union[str, dict]]:
+        cache_key, cached_reply = self._begin_turn(user_input)
+        if cached_reply is not None:
+            return {"status": "success", "reply": cached_reply}
+
         try:
-            response = self.openai_client.chat.completions.create(
+            response = await self.openai_client.chat.completions.create(
                 model="gpt-4o",
                 messages=self.messages,
-                tools=tools
+                tools=_TOOLS,
+                response_format=response_format
             )
 
             # Get the assistant's message as an object
             assistant_message = response.choices[0].message
-            
-            # Convert to dict for message history
-            message_dict = {
-                "role": "assistant",
-                "content": assistant_message.content,
-                "tool_calls": [
-                    {
-                        "id": tool_call.id,
-                        "type": tool_call.type,
-                        "function": {
-                            "name": tool_call.function.name,
-                            "arguments": tool_call.function.arguments
-                        }
-                    } for tool_call in (assistant_message.tool_calls or [])
-                ] if assistant_message.tool_calls else None
-            }
+
+            # The SDK dumps its own message into the dict shape it accepts
+            # back; unset fields (e.g. tool_calls on a plain reply) are left out
+            message_dict = assistant_message.model_dump(exclude_none=True)
             self.messages.append(message_dict)
+            tool_calls = message_dict.get("tool_calls")
 
             # Handle any function calls
-            if assistant_message.tool_calls:
-                for tool_call in assistant_message.tool_calls:
-                    function_name = tool_call.function.name
-                    function_args = json.loads(tool_call.function.arguments)
-                    tool_result = self.handle_function_call(function_name, function_args)
-                    
-                    # Add the function result to messages
-                    self.messages.append({
-                        "role": "tool",
-                        "content": str(tool_result),
-                        "tool_call_id": tool_call.id
-                    })
+            if tool_calls:
+                await self._run_tool_calls(tool_calls)
 
                 # Get final response after function calls
-                final_response = self.openai_client.chat.completions.create(
+                final_response = await self.openai_client.chat.completions.create(
                     model="gpt-4o",
                     messages=self.messages,
-                    tools=tools
+                    tools=_TOOLS,
+                    response_format=response_format
                 )
                 
                 final_message = final_response.choices[0].message
@@ -194,23 +556,120 @@ class GPTExpenseChat:
                     "role": "assistant",
                     "content": final_message.content
                 })
-                
+
+                self._finish_turn(cache_key, final_message.content, tool_calls)
                 return {"status": "success", "reply": final_message.content}
 
+            self._finish_turn(cache_key, assistant_message.content, [])
             return {"status": "success", "reply": assistant_message.content}
 
         except Exception as e:
-            error_message = {"status": "error", "message": str(e)}
-            self.messages.append({
-                "role": "assistant",
-                "content": str(error_message)
-            })
-            return error_message
+            return self._record_error(e)
+
+    async def interact_batch(self, queries: List[str]) -> Dict[str, Any]:
+        # Independent queries share one turn, so the system prompt and tool
+        # schema are sent once rather than once per query
+        if not isinstance(queries, list) or not queries or not all(type(query) is str for query in queries):
+            return {"status": "error", "message": "queries must be a non-empty list of strings"}
+
+        numbered = "\n".join(f"{i}. {query}" for i, query in enumerate(queries, 1))
+        result = await self.interact_async(
+            "Answer each of the following independently, with one answer per "
+            "query, in order. If several queries add transactions, make a "
+            "single add_transactions call with all of them:\n" + numbered,
+            response_format=_BATCH_RESPONSE_FORMAT,
+        )
+        reply = result.get("reply")
+        if result["status"] != "success" or not isinstance(reply, str):
+            return result
+
+        # Any transactions in this turn are already recorded, so a reply that
+        # cannot be split into answers is still returned rather than failed
+        answers = _parse_batch_answers(reply, len(queries))
+        if answers is None:
+            return {"status": "success", "reply": reply}
+        return {"status": "success", "replies": answers}
+
+    async def interact_stream(self, user_input: str) -> AsyncIterator[str]:
+        # Same turn as interact_async, but reply text is yielded as it arrives
+        cache_key, cached_reply = self._begin_turn(user_input)
+        if cached_reply is not None:
+            yield cached_reply
+            return
+
+        try:
+            message: Dict[str, Any] = {"role": "assistant"}
+            async for token in self._stream_completion(message):
+                yield token
+            self.messages.append(message)
+
+            tool_calls = message.get("tool_calls", [])
+            if tool_calls:
+                await self._run_tool_calls(tool_calls)
+
+                # Stream the final response after function calls
+                final_message: Dict[str, Any] = {"role": "assistant"}
+                async for token in self._stream_completion(final_message):
+                    yield token
+                self.messages.append({
+                    "role": "assistant",
+                    "content": final_message["content"]
+                })
+                message = final_message
+
+            self._finish_turn(cache_key, message["content"], tool_calls)
+
+        except Exception as e:
+            self._record_error(e)
+            raise
+
+    async def _stream_completion(self, message: Dict[str, Any]) -> AsyncIterator[str]:
+        # Yields content deltas and fills `message` in as a history entry;
+        # tool calls arrive in fragments keyed by index and are reassembled
+        stream = await self.openai_client.chat.completions.create(
+            model="gpt-4o",
+            messages=self.messages,
+            tools=_TOOLS,
+            stream=True
+        )
+        content: List[str] = []
+        tool_calls: Dict[int, dict] = {}
+        async for chunk in stream:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta
+            if delta.content:
+                content.append(delta.content)
+                yield delta.content
+            for fragment in delta.tool_calls or []:
+                call = tool_calls.setdefault(fragment.index, {"id": None, "type": "function", "function": {"name": "", "arguments": ""}})
+                if fragment.id:
+                    call["id"] = fragment.id
+                if fragment.function and fragment.function.name:
+                    call["function"]["name"] += fragment.function.name
+                if fragment.function and fragment.function.arguments:
+                    call["function"]["arguments"] += fragment.function.arguments
+
+        message["content"] = "".join(content) or None
+        if tool_calls:
+            message["tool_calls"] = [tool_calls[index] for index in sorted(tool_calls)]
+
+
+# Shared instances: one calculator per process, and one conversation per
+# OpenAI client (passing a different client starts a new conversation)
+@functools.lru_cache(maxsize=1)
+def get_calculator() -> GroupExpenseCalculator:
+    return GroupExpenseCalculator()
+
+
+@functools.lru_cache(maxsize=1)
+def get_chat(openai_client) -> GPTExpenseChat:
+    return GPTExpenseChat(openai_client, get_calculator())
 
 
 if __name__ == "__main__":
     import sys
-    from openai import OpenAI
+    from openai import AsyncOpenAI
 
     if len(sys.argv) < 2:
         print("Usage: python gpt_expense_calculator.py '<USER_QUERY>'")
@@ -219,14 +678,13 @@ if __name__ == "__main__":
     user_query = sys.argv[1]
 
     # Initialize OpenAI client
-    client = OpenAI(api_key='api-key-here')
+    client = AsyncOpenAI(api_key='api-key-here')
 
-    # Create instances (these will be singletons)
-    calculator = GroupExpenseCalculator()
-    chat = GPTExpenseChat(client, calculator)
+    # Get the shared instances
+    chat = get_chat(client)
 
     # Process user query
     result = chat.interact(user_query)
 
     # Output result
-    print(json.dumps(result, indent=2))
+    print(_dumps_indented(result).decode())
@@ -1,45 +1,128 @@
 # src/python/server.py
-from http.server import HTTPServer, BaseHTTPRequestHandler
-from calculator.gpt_expense_calculator import GroupExpenseCalculator, GPTExpenseChat
-from openai import OpenAI
+from aiohttp import web
+from calculator.gpt_expense_calculator import get_calculator, get_chat, warm_up
+from openai import AsyncOpenAI
+import asyncio
+import httpx
 import json
 import os
 
-# Initialize OpenAI client and core components once
-openai_client = OpenAI(api_key='api-key-here')
-calculator = GroupExpenseCalculator()  # Will be a singleton
-chat = GPTExpenseChat(openai_client, calculator)  # Will be a singleton
+try:
+    import orjson
+    _loads = orjson.loads
+    _dumps = orjson.dumps
+except ImportError:
+    _loads = json.loads  # type: ignore[assignment]
 
-class ExpenseHandler(BaseHTTPRequestHandler):
-    def do_POST(self):
+    def _dumps(obj):  # type: ignore[misc]
+        return json.dumps(obj).encode()
+
+try:
+    import uvloop
+except ImportError:
+    uvloop = None  # type: ignore[assignment]
+
+# Largest request body accepted
+MAX_BODY = 2 * 1024 * 1024
+
+# Initialize OpenAI client and core components once. The client keeps a
+# pool of HTTP/2 connections so turns after the first skip the TLS handshake,
+# and concurrent requests share them
+openai_client = AsyncOpenAI(
+    api_key='api-key-here',
+    http_client=httpx.AsyncClient(
+        http2=True,
+        limits=httpx.Limits(max_connections=100, max_keepalive_connections=50),
+    ),
+)
+calculator = get_calculator()
+chat = get_chat(openai_client)
+
+# There is a single shared conversation, so chat turns must not interleave
+chat_lock = asyncio.Lock()
+
+async def handle_query(request, data):
+    # Process the query using the existing chat instance; other requests are
+    # served while the turn waits on OpenAI
+    async with chat_lock:
+        return 200, await chat.interact_async(data["query"])
+
+async def handle_batch(request, data):
+    # Several independent queries answered in a single chat turn
+    async with chat_lock:
+        return 200, await chat.interact_batch(data["queries"])
+
+async def handle_stream(request, data):
+    # Same as handle_query, but the reply is sent as plain text while it is
+    # generated. Nothing is sent until the first token arrives, so a failure
+    # before that still reaches dispatch as a JSON error; once streaming has
+    # started errors can only end the stream
+    query = data["query"]
+    async with chat_lock:
+        tokens = chat.interact_stream(query)
         try:
-            # Read request body
-            content_length = int(self.headers["Content-Length"])
-            post_data = self.rfile.read(content_length)
-            data = json.loads(post_data.decode("utf-8"))
-
-            # Process the query using the existing chat instance
-            result = chat.interact(data["query"])
-
-            # Send response
-            self.send_response(200)
-            self.send_header("Content-Type", "application/json")
-            self.end_headers()
-            self.wfile.write(json.dumps(result).encode())
-
-        except Exception as e:
-            print(f"Error processing request: {str(e)}")  # Debug logging
-            self.send_response(500)
-            self.send_header("Content-Type", "application/json")
-            self.end_headers()
-            error_response = {"status": "error", "message": str(e)}
-            self.wfile.write(json.dumps(error_response).encode())
+            first_token = await anext(tokens, "")
+            response = web.StreamResponse(headers={"Content-Type": "text/plain; charset=utf-8"})
+            try:
+                await response.prepare(request)
+                await response.write(first_token.encode())
+                async for token in tokens:
+                    await response.write(token.encode())
+                await response.write_eof()
+            except Exception as e:
+                print(f"Error streaming response: {str(e)}")  # Debug logging
+        finally:
+            await tokens.aclose()
+    return response
+
+async def handle_add_transactions(request, data):
+    result = calculator.add_transactions(data["transactions"])
+    return (200 if result["status"] == "success" else 400), result
+
+async def handle_calculate(request, data):
+    return 200, {"status": "success", "balances": calculator.calculate_balances()}
+
+# Handlers return (status, response) or an already-sent stream response
+ROUTES = {
+    "/": handle_query,
+    "/stream": handle_stream,
+    "/batch": handle_batch,
+    "/add-transactions": handle_add_transactions,
+    "/calculate": handle_calculate,
+}
+
+async def dispatch(request):
+    handler = ROUTES.get(request.path)
+    if handler is None:
+        return _response(404, {"status": "error", "message": f"Unknown path: {request.path}"})
+
+    try:
+        # aiohttp refuses bodies over client_max_size before buffering them.
+        # An empty body is fine for handlers that take no input
+        body = await request.read()
+        data = _loads(body) if body else {}
+        result = await handler(request, data)
+        return result if isinstance(result, web.StreamResponse) else _response(*result)
+
+    except web.HTTPRequestEntityTooLarge:
+        return _response(413, {"status": "error", "message": f"Request body exceeds {MAX_BODY} bytes"})
+    except Exception as e:
+        print(f"Error processing request: {str(e)}")  # Debug logging
+        return _response(500, {"status": "error", "message": str(e)})
+
+def _response(status, response):
+    return web.Response(status=status, body=_dumps(response), content_type="application/json")
+
+def create_app():
+    app = web.Application(client_max_size=MAX_BODY)
+    app.router.add_post("/{path:.*}", dispatch)
+    return app
 
 def run_server(port=3001):
-    server_address = ("", port)
-    httpd = HTTPServer(server_address, ExpenseHandler)
-    print(f"Server running on port {port}")
-    httpd.serve_forever()
+    if uvloop is not None:
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    warm_up()
+    web.run_app(create_app(), port=port, print=lambda _: print(f"Server running on port {port}", flush=True))
 
 if __name__ == "__main__":
     port = int(3001)